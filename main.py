@@ -1,15 +1,19 @@
 import csv
+import hashlib
 import html
 import json
 import os
 import re
+import sys
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
+import ahocorasick
 import ebooklib
-from bs4 import BeautifulSoup
 from ebooklib import epub
+from selectolax.lexbor import LexborHTMLParser
 
 # Define common Portuguese compound expressions
 PORTUGUESE_COMPOUNDS = {
@@ -58,28 +62,111 @@ PORTUGUESE_COMPOUNDS = {
     "nem mesmo": "nem_mesmo",  # not even
 }
 
+# Automaton matching every compound in a single pass over the text
+_COMPOUND_AUTOMATON = ahocorasick.Automaton()
+for _compound, _replacement in PORTUGUESE_COMPOUNDS.items():
+    _COMPOUND_AUTOMATON.add_word(_compound, (_compound, _replacement))
+_COMPOUND_AUTOMATON.make_automaton()
+
+# Compounds only count as whole words, so a hit must not touch a word character
+_WORD_CHAR_RE = re.compile(r"\w")
+
+# Reverse mapping from single-token compounds back to the original expression
+_REVERSE_COMPOUNDS = {v: k for k, v in PORTUGUESE_COMPOUNDS.items()}
+
+# Anything that is not a Portuguese letter, compound underscore or plain space.
+# Other whitespace is replaced as well, so every character left fits in
+# Latin-1 and the cleaned text is stored one byte per character
+_NON_ALPHA_RE = re.compile(r"[^a-záéíóúâêîôûãõàèìòùäëïöüçñ_ ]")
+# Characters not allowed in exported CSV filenames
+_FILENAME_RE = re.compile(r"[^\w\s-]")
+# Raw-text elements written self-closed, as ebooklib serializes empty ones.
+# HTML5 parsers ignore the slash on these, so the rest of the document would
+# be swallowed as script/style contents unless they are closed explicitly.
+_SELF_CLOSED_RAW_TEXT_RE = re.compile(
+    r"<(script|style|title|textarea|iframe|noscript|noembed|noframes|xmp)"
+    r"(\b[^>]*?)\s*/>",
+    re.IGNORECASE,
+)
+# Write buffer for exported CSV files, to keep the number of write calls low
+_CSV_BUFFER_SIZE = 1 << 20
+
+# Per-chapter analysis results are cached here, keyed by chapter content.
+# Per the XDG spec, an empty or relative XDG_CACHE_HOME is ignored
+_XDG_CACHE_HOME = os.environ.get("XDG_CACHE_HOME") or ""
+if not os.path.isabs(_XDG_CACHE_HOME):
+    _XDG_CACHE_HOME = os.path.expanduser("~/.cache")
+CACHE_DIR = os.path.join(_XDG_CACHE_HOME, "ebook-analysis")
+# Mixed into every cache key so that changing the analysis invalidates old
+# results; bump the version when the text processing changes
+_CACHE_VERSION = 1
+_CACHE_SALT = json.dumps(
+    [_CACHE_VERSION, PORTUGUESE_COMPOUNDS], ensure_ascii=False, sort_keys=True
+).encode("utf-8")
+
 
 def replace_compounds(text: str) -> str:
     """
     Replace compound expressions with their single-token versions.
+    Compounds are only replaced where they form whole words.
+    Matching is case-sensitive, so the text must already be lowercase.
 
     Args:
-        text (str): Input text
+        text (str): Lowercase input text
 
     Returns:
         str: Text with compound expressions replaced
     """
-    processed_text = text.lower()
+    # Keep the hits that form whole words, then order them by start position,
+    # longest first, so that overlapping compounds resolve to the leftmost-longest
+    matches = []
+    for end, (compound, replacement) in _COMPOUND_AUTOMATON.iter(text):
+        start = end - len(compound) + 1
+        stop = end + 1
+        if start > 0 and _WORD_CHAR_RE.match(text, start - 1):
+            continue
+        if _WORD_CHAR_RE.match(text, stop):
+            continue
+        matches.append((start, -len(compound), stop, replacement))
+    matches.sort()
+
+    pieces = []
+    position = 0
+    for start, _, stop, replacement in matches:
+        if start < position:
+            continue
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = stop
+    pieces.append(text[position:])
+
+    return "".join(pieces)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Replace special characters with spaces and convert to lowercase.
+    Also handles compound expressions. Whitespace is not collapsed, which
+    str.split() already takes care of when the text is tokenized.
 
-    # Sort compounds by length (longest first) to avoid partial matches
-    sorted_compounds = sorted(PORTUGUESE_COMPOUNDS.keys(), key=len, reverse=True)
+    Args:
+        text (str): Raw text to normalize
 
-    for compound in sorted_compounds:
-        processed_text = processed_text.replace(
-            compound, PORTUGUESE_COMPOUNDS[compound]
-        )
+    Returns:
+        str: Normalized text
+    """
+    # Decode HTML entities; every entity starts with "&", so skip the scan without one
+    if "&" in text:
+        text = html.unescape(text)
 
-    return processed_text
+    # Convert to lowercase
+    text = text.lower()
+
+    # Replace compound expressions before other cleaning
+    text = replace_compounds(text)
+
+    # Remove special characters but keep Portuguese accented characters and underscores (for compounds)
+    return _NON_ALPHA_RE.sub(" ", text)
 
 
 def clean_text(text: str) -> str:
@@ -93,41 +180,48 @@ def clean_text(text: str) -> str:
     Returns:
         str: Cleaned text
     """
-    # Decode HTML entities
-    text = html.unescape(text)
+    # Remove extra whitespace
+    return " ".join(normalize_text(text).split())
 
-    # Convert to lowercase
-    text = text.lower()
 
-    # Replace compound expressions before other cleaning
-    text = replace_compounds(text)
+def html_to_text(tree: LexborHTMLParser) -> str:
+    """
+    Convert parsed HTML content to plain text.
 
-    # Remove special characters but keep Portuguese accented characters and underscores (for compounds)
-    text = re.sub(r"[^a-záéíóúâêîôûãõàèìòùäëïöüçñ\s_]", " ", text)
+    Args:
+        tree (LexborHTMLParser): Parsed HTML content
 
-    # Remove extra whitespace
-    text = re.sub(r"\s+", " ", text)
+    Returns:
+        str: Plain text
+    """
+    # Remove script and style elements
+    for script in tree.css("script, style"):
+        script.decompose()
 
-    return text.strip()
+    return tree.root.text()
 
 
-def html_to_text(content: str) -> str:
+def find_chapter_title(tree: LexborHTMLParser, item_name: str) -> str:
     """
-    Convert HTML content to plain text.
+    Find the title of a parsed chapter.
+
+    Only the text is returned: the title and heading nodes hold a reference to
+    the parsed document, so keeping them would keep the whole tree alive.
 
     Args:
-        content (str): HTML content
+        tree (LexborHTMLParser): Parsed HTML content
+        item_name (str): EPUB item name, used when the chapter has no title
 
     Returns:
-        str: Plain text
+        str: Text of the <title>, else of the first <h1>/<h2>, else item_name
     """
-    soup = BeautifulSoup(content, "html.parser")
+    title = tree.css_first("title")
+    if title is not None:
+        return title.text()
 
-    # Remove script and style elements
-    for script in soup(["script", "style"]):
-        script.decompose()
-
-    return soup.get_text()
+    # Try to find first heading if no title
+    heading = tree.css_first("h1, h2")
+    return heading.text() if heading is not None else item_name
 
 
 def get_word_frequencies(text: str) -> Counter:
@@ -144,131 +238,259 @@ def get_word_frequencies(text: str) -> Counter:
     return Counter(words)
 
 
-def analyze_epub(epub_path: str) -> List[Tuple[str, Dict[str, int]]]:
+def analyze_chapter(content: bytes, item_name: str) -> Tuple[str, Counter]:
+    """
+    Analyze word frequencies of a single EPUB chapter.
+
+    Args:
+        content (bytes): Raw chapter document
+        item_name (str): EPUB item name, used when the chapter has no title
+
+    Returns:
+        Tuple[str, Counter]: (chapter_title, word_frequencies) tuple
+    """
+    # Chapters are XHTML, so close self-closed raw-text elements before parsing
+    document = _SELF_CLOSED_RAW_TEXT_RE.sub(r"<\1\2></\1>", content.decode("utf-8"))
+
+    # Try to get chapter title from the document
+    tree = LexborHTMLParser(document)
+    del document
+    chapter_title = find_chapter_title(tree, item_name)
+
+    # Convert HTML to text, reusing the parsed document, and normalize it.
+    # Each intermediate is released as soon as the next stage has consumed it.
+    text = html_to_text(tree)
+    del tree
+    normalized_text = normalize_text(text)
+    del text
+
+    # Get word frequencies; splitting the normalized text directly avoids
+    # joining the words back into a cleaned string only to split it again
+    frequencies = get_word_frequencies(normalized_text)
+
+    return chapter_title, frequencies
+
+
+def analyze_chapter_cached(content: bytes, item_name: str) -> Tuple[str, Counter]:
+    """
+    Analyze a single EPUB chapter, reusing the result of a previous run from
+    CACHE_DIR when the same chapter has already been analyzed. Caching is
+    best-effort: an unreadable cache falls back to analyzing, and a result
+    that cannot be written is silently not cached.
+
+    Args:
+        content (bytes): Raw chapter document
+        item_name (str): EPUB item name, used when the chapter has no title
+
+    Returns:
+        Tuple[str, Counter]: (chapter_title, word_frequencies) tuple
+    """
+    key = hashlib.sha256(content)
+    key.update(b"\0" + item_name.encode("utf-8") + b"\0" + _CACHE_SALT)
+    cache_file = os.path.join(CACHE_DIR, f"{key.hexdigest()}.json")
+
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cached = json.load(f)
+        # Anything not shaped like an entry written below is treated as a miss
+        if (
+            isinstance(cached, dict)
+            and isinstance(cached.get("title"), str)
+            and isinstance(cached.get("frequencies"), dict)
+            and all(isinstance(freq, int) for freq in cached["frequencies"].values())
+        ):
+            return cached["title"], Counter(cached["frequencies"])
+    except (OSError, ValueError):
+        pass
+
+    chapter_title, frequencies = analyze_chapter(content, item_name)
+
+    # Write to a temporary file first so concurrent workers never read a
+    # partially written entry
+    temp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temp_file, "w", encoding="utf-8") as f:
+            json.dump({"title": chapter_title, "frequencies": frequencies}, f)
+        os.replace(temp_file, cache_file)
+    except OSError:
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+
+    return chapter_title, frequencies
+
+
+def analyze_epub(
+    epub_path: str, use_cache: bool = True
+) -> Iterator[Tuple[str, Counter]]:
     """
     Analyze word frequencies by chapter in an EPUB file.
 
+    Chapters are analyzed in parallel worker processes and yielded in book
+    order. If the book cannot be processed, the error is printed and nothing
+    is yielded. If a later chapter fails after earlier ones have already been
+    yielded, the error is printed and re-raised, so the caller never mistakes
+    part of a book for the whole of it.
+
     Args:
         epub_path (str): Path to EPUB file
+        use_cache (bool): Whether to reuse and store chapter results in CACHE_DIR
 
-    Returns:
-        List[Tuple[str, Dict[str, int]]]: List of (chapter_title, word_frequencies) tuples
+    Yields:
+        Tuple[str, Counter]: (chapter_title, word_frequencies) tuples
     """
+    chapters_yielded = False
     try:
         book = epub.read_epub(epub_path)
-        chapter_analyses = []
+        items = list(book.get_items_of_type(ebooklib.ITEM_DOCUMENT))
+        contents = [item.get_content() for item in items]
+        item_names = [item.get_name() for item in items]
+
+        # Only the chapter documents are needed from here on; drop the rest of
+        # the book (images, fonts, stylesheets) before the chapters are parsed
+        del book, items
+
+        # Check the cache once here: the workers skip failed writes silently,
+        # which would otherwise go unnoticed
+        if use_cache:
+            try:
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                if not os.access(CACHE_DIR, os.W_OK):
+                    raise PermissionError(f"Permission denied: '{CACHE_DIR}'")
+            except OSError as e:
+                print(f"Could not cache chapter analysis: {str(e)}")
+
+        # Chapters are independent, so spread parsing and cleaning across cores
+        analyze = analyze_chapter_cached if use_cache else analyze_chapter
+        with ProcessPoolExecutor() as executor:
+            for chapter_analysis in executor.map(analyze, contents, item_names):
+                chapters_yielded = True
+                yield chapter_analysis
 
-        for item in book.get_items_of_type(ebooklib.ITEM_DOCUMENT):
-            # Try to get chapter title from the document
-            content = item.get_content().decode("utf-8")
-            soup = BeautifulSoup(content, "html.parser")
-            title = soup.find("title")
-            if title:
-                chapter_title = title.get_text()
-            else:
-                # Try to find first heading if no title
-                heading = soup.find(["h1", "h2"])
-                chapter_title = heading.get_text() if heading else item.get_name()
+    except Exception as e:
+        print(f"Error processing EPUB: {str(e)}")
+        if chapters_yielded:
+            raise
 
-            # Convert HTML to text and clean it
-            text = html_to_text(content)
-            cleaned_text = clean_text(text)
 
-            # Get word frequencies
-            frequencies = get_word_frequencies(cleaned_text)
+def sort_frequencies(
+    frequencies: Dict[str, int],
+    min_frequency: int = 1,
+    sort_by: str = "frequency",
+) -> List[Tuple[str, int]]:
+    """
+    Filter word frequencies by minimum frequency and sort them.
 
-            chapter_analyses.append((chapter_title, dict(frequencies)))
+    Args:
+        frequencies: Word frequencies of a chapter
+        min_frequency: Minimum frequency to include in output
+        sort_by: 'frequency' or 'alphabetical'
 
-        return chapter_analyses
+    Returns:
+        List[Tuple[str, int]]: Sorted (word, frequency) pairs
+    """
+    filtered_frequencies = [
+        (word, freq) for word, freq in frequencies.items() if freq >= min_frequency
+    ]
 
-    except Exception as e:
-        print(f"Error processing EPUB: {str(e)}")
-        return []
+    if sort_by == "frequency":
+        return sorted(filtered_frequencies, key=lambda x: (-x[1], x[0]))
+    else:  # alphabetical
+        return sorted(filtered_frequencies, key=lambda x: x[0])
 
 
 def export_to_csv(
-    chapter_analyses: List[Tuple[str, Dict[str, int]]],
+    chapter_analyses: Iterable[Tuple[str, Dict[str, int]]],
     min_frequency: int = 1,
     sort_by: str = "frequency",
+    sorted_words_by_chapter: Optional[List[List[Tuple[str, int]]]] = None,
 ) -> None:
     """
     Export word frequency analysis to CSV files.
 
+    The chapter analyses are consumed in a single pass, so a generator such as
+    the one returned by analyze_epub can be passed directly.
+
     Args:
-        chapter_analyses: List of (chapter_title, word_frequencies) tuples
+        chapter_analyses: Iterable of (chapter_title, word_frequencies) tuples
         min_frequency: Minimum frequency to include in output
         sort_by: 'frequency' or 'alphabetical'
+        sorted_words_by_chapter: Output of sort_frequencies for each chapter,
+            in the same order as chapter_analyses, if already computed
     """
     # Create output directory with timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     output_dir = f"word_frequency_analysis_{timestamp}"
     os.makedirs(output_dir, exist_ok=True)
 
+    # Accumulated while writing the chapter files, for the combined analysis
+    chapter_titles = []
+    chapter_word_counts = []
+
     # Export individual chapter files
-    for chapter_title, frequencies in chapter_analyses:
+    for chapter_index, (chapter_title, frequencies) in enumerate(chapter_analyses):
         # Clean filename
-        clean_title = re.sub(r"[^\w\s-]", "", chapter_title)
+        clean_title = _FILENAME_RE.sub("", chapter_title)
         clean_title = clean_title.replace(" ", "_")
         filename = os.path.join(output_dir, f"{clean_title}_frequencies.csv")
 
-        # Filter and sort frequencies
-        filtered_frequencies = {
-            word: freq for word, freq in frequencies.items() if freq >= min_frequency
-        }
-
-        if sort_by == "frequency":
-            sorted_words = sorted(
-                filtered_frequencies.items(), key=lambda x: (-x[1], x[0])
-            )
-        else:  # alphabetical
-            sorted_words = sorted(filtered_frequencies.items(), key=lambda x: x[0])
+        # Filter and sort frequencies, unless the caller already did
+        if sorted_words_by_chapter is None:
+            sorted_words = sort_frequencies(frequencies, min_frequency, sort_by)
+        else:
+            sorted_words = sorted_words_by_chapter[chapter_index]
 
         # Write to CSV
-        with open(filename, "w", newline="", encoding="utf-8") as f:
+        with open(
+            filename, "w", newline="", encoding="utf-8", buffering=_CSV_BUFFER_SIZE
+        ) as f:
             writer = csv.writer(f)
             writer.writerow(["Word", "Frequency"])
             writer.writerows(sorted_words)
 
+        chapter_titles.append(chapter_title)
+        chapter_word_counts.append(sorted_words)
+
     # Export combined analysis
     combined_filename = os.path.join(output_dir, "combined_analysis.csv")
-    all_words = set()
-    chapter_word_counts = {}
 
-    # First pass: collect all unique words
-    for chapter_title, frequencies in chapter_analyses:
-        filtered_frequencies = {
-            word: freq for word, freq in frequencies.items() if freq >= min_frequency
-        }
-        all_words.update(filtered_frequencies.keys())
-        chapter_word_counts[chapter_title] = filtered_frequencies
+    # Build one row of per-chapter counts per word, touching each count once
+    num_chapters = len(chapter_titles)
+    rows: Dict[str, List[int]] = {}
+    total_frequencies = Counter()
+    for chapter_index, sorted_words in enumerate(chapter_word_counts):
+        for word, freq in sorted_words:
+            row = rows.get(word)
+            if row is None:
+                row = rows[word] = [0] * num_chapters
+            row[chapter_index] = freq
+            total_frequencies[word] += freq
 
     # Sort words according to specified method
     if sort_by == "frequency":
-        # Calculate total frequency across all chapters for sorting
-        total_frequencies = Counter()
-        for frequencies in chapter_word_counts.values():
-            total_frequencies.update(frequencies)
-        all_words = sorted(all_words, key=lambda x: (-total_frequencies[x], x))
+        all_words = sorted(total_frequencies, key=lambda x: (-total_frequencies[x], x))
     else:  # alphabetical
-        all_words = sorted(all_words)
+        all_words = sorted(total_frequencies)
 
     # Write combined CSV
-    with open(combined_filename, "w", newline="", encoding="utf-8") as f:
+    with open(
+        combined_filename,
+        "w",
+        newline="",
+        encoding="utf-8",
+        buffering=_CSV_BUFFER_SIZE,
+    ) as f:
         writer = csv.writer(f)
         # Header row with chapter titles
-        header = ["Word"] + [title for title, _ in chapter_analyses] + ["Total"]
+        header = ["Word"] + chapter_titles + ["Total"]
         writer.writerow(header)
 
         # Write data for each word
-        for word in all_words:
-            row = [word]
-            total = 0
-            for chapter_title, _ in chapter_analyses:
-                freq = chapter_word_counts[chapter_title].get(word, 0)
-                row.append(freq)
-                total += freq
-            row.append(total)
-            writer.writerow(row)
+        writer.writerows(
+            (word, *rows[word], total_frequencies[word]) for word in all_words
+        )
 
     print(f"\nCSV files exported to directory: {output_dir}")
     print(f"Individual chapter files and combined analysis have been created.")
@@ -281,10 +503,8 @@ def print_compounds_found(chapter_analyses: List[Tuple[str, Dict[str, int]]]) ->
     Args:
         chapter_analyses: List of (chapter_title, word_frequencies) tuples
     """
-    print("\n=== Compound Expressions Analysis ===")
-
-    # Create reverse mapping for easier lookup
-    reverse_compounds = {v: k for k, v in PORTUGUESE_COMPOUNDS.items()}
+    # Collect the report and write it out in one go
+    lines = ["\n=== Compound Expressions Analysis ==="]
 
     # Track compounds found across all chapters
     total_compounds = Counter()
@@ -293,26 +513,28 @@ def print_compounds_found(chapter_analyses: List[Tuple[str, Dict[str, int]]]) ->
         compounds_in_chapter = {
             word: freq
             for word, freq in frequencies.items()
-            if word in reverse_compounds
+            if word in _REVERSE_COMPOUNDS
         }
 
         if compounds_in_chapter:
-            print(f"\nChapter: {chapter_title}")
+            lines.append(f"\nChapter: {chapter_title}")
             for compound, freq in sorted(
                 compounds_in_chapter.items(), key=lambda x: (-x[1], x[0])
             ):
-                original = reverse_compounds[compound]
-                print(f"'{original}' appears {freq} times")
+                original = _REVERSE_COMPOUNDS[compound]
+                lines.append(f"'{original}' appears {freq} times")
                 total_compounds[compound] += freq
 
-    print("\nTotal Compound Expressions Across All Chapters:")
+    lines.append("\nTotal Compound Expressions Across All Chapters:")
     for compound, total in sorted(total_compounds.items(), key=lambda x: (-x[1], x[0])):
-        original = reverse_compounds[compound]
-        print(f"'{original}': {total} total occurrences")
+        original = _REVERSE_COMPOUNDS[compound]
+        lines.append(f"'{original}': {total} total occurrences")
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def print_chapter_analysis(
-    chapter_analyses: List[Tuple[str, Dict[str, int]]],
+    chapter_analyses: Iterable[Tuple[str, Dict[str, int]]],
     output_format: str = "text",
     min_frequency: int = 1,
     sort_by: str = "frequency",
@@ -322,48 +544,50 @@ def print_chapter_analysis(
     Print word frequency analysis for each chapter and optionally export to CSV.
 
     Args:
-        chapter_analyses: List of (chapter_title, word_frequencies) tuples
+        chapter_analyses: Iterable of (chapter_title, word_frequencies) tuples
         output_format: 'text' or 'json'
         min_frequency: Minimum frequency to include in output
         sort_by: 'frequency' or 'alphabetical'
         export_csv: Whether to export results to CSV files
     """
+    # The compound summary is printed before the chapters, so collect them once
+    chapter_analyses = list(chapter_analyses)
+
+    # Filter and sort each chapter once; the CSV export reuses the result
+    sorted_words_by_chapter = [
+        sort_frequencies(frequencies, min_frequency, sort_by)
+        for _, frequencies in chapter_analyses
+    ]
+
     # Print compound expressions analysis first
     print_compounds_found(chapter_analyses)
 
     results = {}
 
-    for chapter_title, frequencies in chapter_analyses:
-        # Filter words by minimum frequency
-        filtered_frequencies = {
-            word: freq for word, freq in frequencies.items() if freq >= min_frequency
-        }
-
-        # Sort words according to specified method
-        if sort_by == "frequency":
-            sorted_words = sorted(
-                filtered_frequencies.items(), key=lambda x: (-x[1], x[0])
-            )
-        else:  # alphabetical
-            sorted_words = sorted(filtered_frequencies.items(), key=lambda x: x[0])
-
+    for (chapter_title, frequencies), sorted_words in zip(
+        chapter_analyses, sorted_words_by_chapter
+    ):
         if output_format == "json":
             results[chapter_title] = dict(sorted_words)
         else:
-            print(f"\n=== {chapter_title} ===")
-            print(f"Total unique words: {len(sorted_words)}")
-            print("\nWord Frequencies:")
-            for word, freq in sorted_words:
-                print(f"{word}: {freq}")
+            # Collect the chapter report and write it out in one go
+            lines = [
+                f"\n=== {chapter_title} ===",
+                f"Total unique words: {len(sorted_words)}",
+                "\nWord Frequencies:",
+            ]
+            lines.extend(f"{word}: {freq}" for word, freq in sorted_words)
 
             # Print some statistics
             total_words = sum(frequencies.values())
-            print(f"\nChapter Statistics:")
-            print(f"Total words: {total_words}")
-            print(f"Unique words: {len(frequencies)}")
+            lines.append("\nChapter Statistics:")
+            lines.append(f"Total words: {total_words}")
+            lines.append(f"Unique words: {len(frequencies)}")
+
+            sys.stdout.write("\n".join(lines) + "\n")
 
     if export_csv:
-        export_to_csv(chapter_analyses, min_frequency, sort_by)
+        export_to_csv(chapter_analyses, min_frequency, sort_by, sorted_words_by_chapter)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+import contextlib
+import io
+import os
+import random
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from ebooklib import epub
+
+import main
+
+RAW_TEXT_TAGS = ["script", "style", "title", "textarea", "iframe"]
+
+
+def chapter_document(body: str) -> bytes:
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<html xmlns="http://www.w3.org/1999/xhtml">'
+        f"<head/><body>{body}</body></html>"
+    ).encode("utf-8")
+
+
+def write_book(path: str, chapter_contents: list) -> None:
+    book = epub.EpubBook()
+    book.set_identifier("regression")
+    book.set_title("Regression")
+    book.set_language("pt")
+    chapters = []
+    for i, content in enumerate(chapter_contents):
+        chapter = epub.EpubHtml(title=f"Cap {i}", file_name=f"c{i}.xhtml", lang="pt")
+        chapter.content = content
+        book.add_item(chapter)
+        chapters.append(chapter)
+    book.add_item(epub.EpubNcx())
+    book.add_item(epub.EpubNav())
+    book.toc = chapters
+    book.spine = chapters
+    epub.write_epub(path, book)
+
+
+class ReplaceCompoundsTest(unittest.TestCase):
+    def test_overlapping_compounds(self):
+        cases = {
+            "em frente a casa": "em_frente_a casa",
+            "em frente amanhã": "em_frente amanhã",
+            "mesmo que": "mesmo_que",
+            "todo mundo que": "todo_mundo que",
+            "isso quer dizer": "isso quer_dizer",
+            "o que": "o_que",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(main.replace_compounds(text), expected)
+
+    def test_matches_word_boundary_alternation(self):
+        # Reference: whole-word alternation, longest compound first
+        compounds = main.PORTUGUESE_COMPOUNDS
+        reference = re.compile(
+            r"\b(?:"
+            + "|".join(
+                re.escape(compound)
+                for compound in sorted(compounds, key=len, reverse=True)
+            )
+            + r")\b"
+        )
+        words = sorted(
+            {word for compound in compounds for word in compound.split()}
+            | {"casa", "isso", "amanhã", "aquilo"}
+        )
+        rng = random.Random(0)
+        for _ in range(2000):
+            text = " ".join(rng.choices(words, k=rng.randint(1, 12)))
+            with self.subTest(text=text):
+                self.assertEqual(
+                    main.replace_compounds(text),
+                    reference.sub(lambda m: compounds[m.group()], text),
+                )
+
+
+class SelfClosedRawTextTest(unittest.TestCase):
+    def test_self_closed_raw_text_elements_keep_following_text(self):
+        for tag in RAW_TEXT_TAGS:
+            with self.subTest(tag=tag):
+                content = chapter_document(
+                    f'<p>antes</p>\n<{tag} src="a.js"/>\n'
+                    "<p>depois casa menino</p>\n<p>fim</p>"
+                )
+                _, frequencies = main.analyze_chapter(content, "c0.xhtml")
+                self.assertEqual(
+                    frequencies,
+                    {"antes": 1, "depois": 1, "casa": 1, "menino": 1, "fim": 1},
+                )
+
+    def test_script_round_tripped_through_ebooklib(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "book.epub")
+            write_book(
+                path,
+                [
+                    "<html><body><p>antes</p><script src='a.js'></script>"
+                    "<p>depois casa menino</p><p>fim</p></body></html>"
+                ],
+            )
+            chapter_analyses = list(main.analyze_epub(path, use_cache=False))
+
+        # ebooklib rewrites the empty script as <script src="a.js"/>
+        self.assertEqual(
+            chapter_analyses[0],
+            ("c0.xhtml", {"antes": 1, "depois": 1, "casa": 1, "menino": 1, "fim": 1}),
+        )
+
+
+class ChapterCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        self.original_cache_dir = main.CACHE_DIR
+        main.CACHE_DIR = self.cache_dir.name
+        self.addCleanup(setattr, main, "CACHE_DIR", self.original_cache_dir)
+        self.content = chapter_document("<p>o que casa</p>")
+        self.expected = ("c0.xhtml", {"o_que": 1, "casa": 1})
+
+    def test_malformed_entries_fall_back_to_analyzing(self):
+        main.analyze_chapter_cached(self.content, "c0.xhtml")
+        (entry,) = os.listdir(self.cache_dir.name)
+        entry_path = os.path.join(self.cache_dir.name, entry)
+
+        for malformed in ["[]", "{}", '{"title": 1, "frequencies": {}}', "nope"]:
+            with self.subTest(entry=malformed):
+                with open(entry_path, "w", encoding="utf-8") as f:
+                    f.write(malformed)
+                self.assertEqual(
+                    main.analyze_chapter_cached(self.content, "c0.xhtml"),
+                    self.expected,
+                )
+
+    def test_failed_write_leaves_no_temporary_file(self):
+        main.analyze_chapter_cached(self.content, "c0.xhtml")
+        (entry,) = os.listdir(self.cache_dir.name)
+        entry_path = os.path.join(self.cache_dir.name, entry)
+
+        # A directory in place of the entry makes both reading and replacing fail
+        os.remove(entry_path)
+        os.mkdir(entry_path)
+
+        self.assertEqual(
+            main.analyze_chapter_cached(self.content, "c0.xhtml"), self.expected
+        )
+        self.assertEqual(os.listdir(self.cache_dir.name), [entry])
+
+    def test_unusable_cache_is_reported_once(self):
+        # A file in place of the cache directory makes every write fail
+        main.CACHE_DIR = os.path.join(self.cache_dir.name, "file")
+        open(main.CACHE_DIR, "w").close()
+        path = os.path.join(self.cache_dir.name, "book.epub")
+        write_book(path, ["<html><body><p>o que casa</p></body></html>"] * 3)
+
+        # Workers that re-import main rather than fork must not use the real cache
+        output = io.StringIO()
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": main.CACHE_DIR}):
+            with contextlib.redirect_stdout(output):
+                chapter_analyses = list(main.analyze_epub(path))
+
+        self.assertEqual(
+            [frequencies for _, frequencies in chapter_analyses[:3]],
+            [{"o_que": 1, "casa": 1}] * 3,
+        )
+        self.assertEqual(output.getvalue().count("Could not cache"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()